@@ -1,8 +1,11 @@
+import asyncio
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends
 import hashlib
+import hmac
 import secrets
 import string
 from fastapi import HTTPException
@@ -15,6 +18,8 @@ from collections import defaultdict, deque
 from typing import Deque, Dict
 from email_service import email_service
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -31,7 +36,7 @@ def simple_verify_password(password: str, hashed_password: str) -> bool:
     try:
         salt, stored_hash = hashed_password.split(":", 1)
         password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        return password_hash == stored_hash
+        return hmac.compare_digest(password_hash, stored_hash)
     except:
         return False
 
@@ -57,6 +62,33 @@ def register_login_failure(identifier: str) -> None:
 def register_login_success(identifier: str) -> None:
     _login_attempts.pop(identifier, None)
 
+# Simple in-memory outbound email throttling (per-process best-effort)
+# Prevents unbounded SMTP sends (each one is a TLS handshake + DB round trips)
+_email_sends: Dict[str, Deque[datetime]] = defaultdict(deque)
+_EMAIL_SEND_MIN_INTERVAL_SECONDS = 60  # at most 1 send per minute per email
+_EMAIL_SEND_WINDOW_SECONDS = 3600  # sliding window
+_EMAIL_SEND_MAX_PER_WINDOW = 5  # at most 5 sends per hour per email
+
+def _prune_email_sends(email: str) -> None:
+    window_start = datetime.utcnow() - timedelta(seconds=_EMAIL_SEND_WINDOW_SECONDS)
+    sends = _email_sends[email]
+    while sends and sends[0] < window_start:
+        sends.popleft()
+
+def is_email_send_allowed(email: str) -> bool:
+    """Check if we may send another email to this address (sliding window)"""
+    _prune_email_sends(email)
+    sends = _email_sends[email]
+    if len(sends) >= _EMAIL_SEND_MAX_PER_WINDOW:
+        return False
+    if sends and (datetime.utcnow() - sends[-1]).total_seconds() < _EMAIL_SEND_MIN_INTERVAL_SECONDS:
+        return False
+    return True
+
+def register_email_send(email: str) -> None:
+    _prune_email_sends(email)
+    _email_sends[email].append(datetime.utcnow())
+
 def verify_password(plain_password, hashed_password):
     """Verify password using simple hashing"""
     return simple_verify_password(plain_password, hashed_password)
@@ -87,6 +119,68 @@ def get_token_from_header(authorization: str = None):
     except:
         return None
 
+def token_is_admin_claim(token: str) -> Optional[bool]:
+    """Read the is_admin claim from a token without touching the database.
+
+    Login encodes is_admin into the JWT, so admin dependencies can reject
+    non-admin callers from the decode alone instead of paying a user
+    lookup just to check the flag. Returns None when the token is invalid
+    or predates the claim - callers fall through to get_current_user,
+    which still does the authoritative fetch (and catches demotions that
+    happened after the token was minted).
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    is_admin = payload.get("is_admin")
+    return is_admin if isinstance(is_admin, bool) else None
+
+# Coalesce concurrent identical user lookups: when N requests for the same
+# account decode their tokens at the same time, only one find_one goes to
+# MongoDB and the others await its result (single-flight)
+_user_lookups_inflight: Dict[str, "asyncio.Task"] = {}
+
+# Short-TTL cache layered on top: a logged-in user clicking around issues
+# many sequential requests that all resolve the same account. Account
+# deactivation can lag by up to the TTL, which is far shorter than the
+# token lifetime the same flip already has to wait out.
+_user_cache: Dict[str, tuple] = {}
+_USER_CACHE_TTL_SECONDS = 30
+_USER_CACHE_MAX_ENTRIES = 1024
+
+def invalidate_user_cache(email: str) -> None:
+    """Drop a cached user after a credential or account change"""
+    _user_cache.pop(email, None)
+
+async def _find_user_by_email(email: str) -> Optional[models.User]:
+    cached = _user_cache.get(email)
+    if cached is not None:
+        user, expires = cached
+        if datetime.utcnow() < expires:
+            return user
+        _user_cache.pop(email, None)
+
+    task = _user_lookups_inflight.get(email)
+    if task is None:
+        task = asyncio.create_task(
+            models.User.find_one(models.User.email == email)
+        )
+        _user_lookups_inflight[email] = task
+        task.add_done_callback(
+            lambda _t, _email=email: _user_lookups_inflight.pop(_email, None)
+        )
+    # Shield so one cancelled request doesn't kill the shared lookup
+    user = await asyncio.shield(task)
+    if user is not None:
+        if len(_user_cache) >= _USER_CACHE_MAX_ENTRIES:
+            _user_cache.clear()
+        _user_cache[email] = (
+            user,
+            datetime.utcnow() + timedelta(seconds=_USER_CACHE_TTL_SECONDS),
+        )
+    return user
+
 async def get_current_user(token: str = None):
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -107,12 +201,12 @@ async def get_current_user(token: str = None):
         raise credentials_exception
     
     try:
-        user = await models.User.find_one(models.User.email == email)
+        user = await _find_user_by_email(email)
         if user is None:
             raise credentials_exception
         return user
     except Exception as e:
-        print(f"Database error during user lookup: {e}")
+        logger.error("Database error during user lookup: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database service unavailable"
@@ -152,39 +246,52 @@ async def get_current_referral(token: str = None):
             raise credentials_exception
         return referral
     except Exception as e:
-        print(f"Database error during referral lookup: {e}")
+        logger.error("Database error during referral lookup: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database service unavailable"
         )
 
 def generate_unique_affiliate_link():
-    """Generate a unique link for affiliates"""
-    characters = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(characters) for _ in range(20))
+    """Generate a unique link for affiliates (20 URL-safe characters)"""
+    # token_urlsafe(15) -> exactly 20 characters in one call, instead of
+    # 20 separate secrets.choice draws
+    return secrets.token_urlsafe(15)
 
 def generate_verification_token():
     """Generate a secure verification token"""
     return secrets.token_urlsafe(32)
 
-async def send_welcome_email(email: str, user_type: str, name: str = None) -> bool:
-    """Send welcome email after registration"""
-    return await email_service.send_welcome_email(email, user_type, name)
-
 async def create_password_reset_token(email: str) -> str:
-    """Create and store password reset token"""
+    """Create and store password reset token.
+
+    Upserts on (email, token_type) in a single round trip - the new token
+    replaces any previous one, so old tokens are invalidated without a
+    separate delete query.
+    """
     token = generate_verification_token()
-    expires_at = datetime.utcnow() + timedelta(hours=24)  # 24 hours for password reset
-    
-    # Create password reset token record
-    reset_token = models.EmailVerificationToken(
-        email=email,
-        token=token,
-        token_type="password_reset",
-        expires_at=expires_at
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=24)  # 24 hours for password reset
+
+    await models.EmailVerificationToken.find_one(
+        models.EmailVerificationToken.email == email,
+        models.EmailVerificationToken.token_type == "password_reset"
+    ).upsert(
+        {"$set": {
+            "token": token,
+            "expires_at": expires_at,
+            "is_used": False,
+            "used_at": None,
+            "created_at": now,
+        }},
+        on_insert=models.EmailVerificationToken(
+            email=email,
+            token=token,
+            token_type="password_reset",
+            expires_at=expires_at
+        )
     )
-    await reset_token.insert()
-    
+
     return token
 
 async def verify_password_reset_token(token: str) -> Optional[models.EmailVerificationToken]:
@@ -210,7 +317,7 @@ async def verify_password_reset_token(token: str) -> Optional[models.EmailVerifi
         return token_record
         
     except Exception as e:
-        print(f"Error verifying password reset token: {e}")
+        logger.error("Error verifying password reset token: %s", e)
         return None
 
 async def mark_password_reset_token_as_used(token_record: models.EmailVerificationToken):
@@ -224,7 +331,7 @@ async def send_password_reset_email(email: str, token: str) -> bool:
     # Note: EMAIL_VERIFICATION_ENABLED only controls password reset emails, not OTP verification
     # OTP verification system has been removed - emails are auto-verified
     if not settings.EMAIL_VERIFICATION_ENABLED:
-        print("Warning: Email sending is disabled. Password reset email will not be sent.")
+        logger.warning("Email sending is disabled. Password reset email will not be sent.")
         return False
     
     return await email_service.send_password_reset_email(email, token)
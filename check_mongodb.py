@@ -3,7 +3,7 @@
 Check if MongoDB is running and provide instructions
 """
 import asyncio
-import motor.motor_asyncio
+from pymongo import AsyncMongoClient
 from config import settings
 
 async def check_mongodb():
@@ -11,7 +11,7 @@ async def check_mongodb():
     print(f"Connection string: {settings.DATABASE_URL}")
     
     try:
-        client = motor.motor_asyncio.AsyncIOMotorClient(
+        client = AsyncMongoClient(
             settings.DATABASE_URL,
             serverSelectionTimeoutMS=5000
         )
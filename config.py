@@ -30,6 +30,7 @@ class Settings(BaseSettings):
     EMAIL_SMTP_PASSWORD: Optional[str] = None
     EMAIL_FROM_NAME: str = "Affiliate Management System"
     EMAIL_FROM_EMAIL: Optional[str] = None
+    EMAIL_SMTP_POOL_SIZE: int = 2  # Max concurrent SMTP connections kept alive
     
     # Cloudinary settings for image storage
     CLOUDINARY_CLOUD_NAME: str = ""
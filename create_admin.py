@@ -5,6 +5,7 @@ Simple script to create an admin user
 import asyncio
 from database import init_db
 from crud import create_admin_user
+from email_service import email_service
 
 async def main():
     print("Connecting to database...")
@@ -27,6 +28,10 @@ async def main():
         print("Password: admin1234")
     except Exception as e:
         print(f"ERROR: Error creating admin user: {e}")
+    finally:
+        # The welcome email is queued in the background - flush it before
+        # the event loop exits, or it is silently dropped
+        await email_service.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,13 +1,32 @@
+import asyncio
+import logging
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import models
 import schemas
-from auth_utils import get_password_hash, verify_password, generate_unique_affiliate_link, send_welcome_email
+from auth_utils import get_password_hash, verify_password, generate_unique_affiliate_link
 from config import settings
 from beanie import PydanticObjectId
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Lightweight projections for hot-path queries - only pull the fields we
+# actually use instead of the full document
+class UserAuthProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    hashed_password: str
+    is_admin: bool
+    is_active: bool
+
+class ReferralAuthProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    hashed_password: str
+
 async def initialize_system():
     """Initialize system with admin link configuration"""
     admin_link = settings.ADMIN_REGISTRATION_LINK
@@ -23,10 +42,14 @@ async def initialize_system():
     # Initialize admin user if specified in env
     admin_email = settings.ADMIN_EMAIL
     admin_password = settings.ADMIN_PASSWORD
-    
+
     if admin_email and admin_password:
         await create_admin_user(admin_email, admin_password)
-    
+
+    # Prime the registration-link cache so the first /register hits after
+    # startup don't each pay a SystemConfig read
+    await get_admin_registration_link()
+
     return config
 
 async def create_admin_user(email: str, password: str):
@@ -42,19 +65,32 @@ async def create_admin_user(email: str, password: str):
         )
         await admin.insert()
         
-        # Send welcome email
-        try:
-            await send_welcome_email(email, "admin", email.split('@')[0])
-        except Exception as e:
-            print(f"Warning: Failed to send welcome email to {email}: {e}")
+        # Send welcome email in the background - don't block on SMTP
+        from email_service import email_service
+        email_service.send_in_background(
+            email_service.send_welcome_email(email, "admin", email.split('@')[0])
+        )
     return admin
 
+# Short-TTL cache for the admin registration link - it is read on every
+# /register/{link} hit but only ever written during startup
+_admin_link_cache: Optional[str] = None
+_admin_link_cache_expires: datetime = datetime.min
+_ADMIN_LINK_CACHE_TTL_SECONDS = 60
+
 async def get_admin_registration_link():
-    """Get the fixed admin registration link"""
+    """Get the fixed admin registration link (cached with a short TTL)"""
+    global _admin_link_cache, _admin_link_cache_expires
+
+    now = datetime.utcnow()
+    if _admin_link_cache is not None and now < _admin_link_cache_expires:
+        return _admin_link_cache
+
     config = await models.SystemConfig.find_one()
-    if config:
-        return config.admin_registration_link
-    return settings.ADMIN_REGISTRATION_LINK
+    link = config.admin_registration_link if config else settings.ADMIN_REGISTRATION_LINK
+    _admin_link_cache = link
+    _admin_link_cache_expires = now + timedelta(seconds=_ADMIN_LINK_CACHE_TTL_SECONDS)
+    return link
 
 async def verify_registration_link(link_code: str):
     """Verify if the provided link is the valid admin registration link"""
@@ -63,15 +99,16 @@ async def verify_registration_link(link_code: str):
 
 async def create_affiliate_request(request: schemas.AffiliateRequestCreate):
     """Create a new affiliate registration request"""
-    # Check if email already exists in requests or users
-    existing_request = await models.AffiliateRequest.find_one(
+    # Check if email already exists in requests or users - existence
+    # checks only, no need to pull the documents back
+    existing_request = await models.AffiliateRequest.find(
         models.AffiliateRequest.email == request.email
-    )
-    
-    existing_user = await models.User.find_one(
+    ).exists()
+
+    existing_user = await models.User.find(
         models.User.email == request.email
-    )
-    
+    ).exists()
+
     if existing_request or existing_user:
         return None
     
@@ -87,7 +124,8 @@ async def create_affiliate_request(request: schemas.AffiliateRequestCreate):
         is_email_verified=True  # Auto-verified, no OTP required
     )
     await affiliate_request.insert()
-    
+    invalidate_request_list_cache()
+
     # Return response format with string ID
     return schemas.AffiliateRequestResponse(
         id=str(affiliate_request.id),
@@ -103,16 +141,82 @@ async def create_affiliate_request(request: schemas.AffiliateRequestCreate):
         reviewed_at=affiliate_request.reviewed_at
     )
 
-async def get_pending_requests():
-    """Get all pending affiliate requests"""
-    requests = await models.AffiliateRequest.find(
+# Small TTL cache for the admin request lists. Entries are keyed by the
+# query parameters and the whole cache is dropped whenever a request is
+# created or reviewed, so admins never see stale data longer than the TTL.
+_request_list_cache: dict = {}
+_REQUEST_LIST_CACHE_TTL_SECONDS = 30
+_REQUEST_LIST_CACHE_MAX_ENTRIES = 128
+
+def _request_list_cache_get(key):
+    entry = _request_list_cache.get(key)
+    if entry is None:
+        return None
+    result, expires = entry
+    if datetime.utcnow() >= expires:
+        _request_list_cache.pop(key, None)
+        return None
+    return result
+
+def _request_list_cache_put(key, result):
+    if len(_request_list_cache) >= _REQUEST_LIST_CACHE_MAX_ENTRIES:
+        _request_list_cache.clear()
+    expires = datetime.utcnow() + timedelta(seconds=_REQUEST_LIST_CACHE_TTL_SECONDS)
+    _request_list_cache[key] = (result, expires)
+
+def invalidate_request_list_cache():
+    """Drop cached request listings after an AffiliateRequest write.
+
+    Public because some routers delete AffiliateRequest rows directly
+    and must not leave stale listings behind.
+    """
+    _request_list_cache.clear()
+
+# Projection for the pending-request list - everything the response needs
+# and nothing else (notably not hashed_password)
+class AffiliateRequestListProjection(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    email: str
+    location: str
+    language: str
+    puprime_referral_code: Optional[str] = Field(None, alias="onemove_link")
+    puprime_link: str
+    status: models.RequestStatus
+    is_email_verified: bool = True
+    created_at: datetime
+    reviewed_at: Optional[datetime] = None
+
+async def get_pending_requests(limit: int = 100, created_before: Optional[datetime] = None):
+    """Get pending affiliate requests (newest first, bounded).
+
+    For the next page pass created_before (the created_at of the last
+    item of the previous page) - range-key pagination instead of an
+    unbounded scan.
+    """
+    if limit < 1:
+        limit = 1
+    if limit > 500:
+        limit = 500
+
+    cache_key = ("pending", limit, created_before)
+    cached = _request_list_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    query = models.AffiliateRequest.find(
         models.AffiliateRequest.status == models.RequestStatus.PENDING
-    ).sort("-created_at").to_list()
-    
-    # Convert to response format with string IDs
+    )
+    if created_before is not None:
+        query = query.find(models.AffiliateRequest.created_at < created_before)
+
     result = []
-    for request in requests:
-        result.append(schemas.AffiliateRequestResponse(
+    async for request in query.sort("-created_at").limit(limit).project(
+        AffiliateRequestListProjection
+    ):
+        result.append(schemas.AffiliateRequestResponse.model_construct(
             id=str(request.id),
             name=request.name,
             email=request.email,
@@ -125,14 +229,22 @@ async def get_pending_requests():
             created_at=request.created_at,
             reviewed_at=request.reviewed_at
         ))
+    _request_list_cache_put(cache_key, result)
     return result
 
 async def get_all_requests(
     status: Optional[models.RequestStatus] = None,
     page: int = 1,
     page_size: int = 20,
+    created_before: Optional[datetime] = None,
 ):
-    """Get all affiliate requests, optionally filtered by status, paginated"""
+    """Get all affiliate requests, optionally filtered by status, paginated.
+
+    When created_before is given, range-key pagination is used instead of
+    skip(): pass the created_at of the last item of the previous page.
+    This stays O(page_size) no matter how deep the caller paginates,
+    whereas skip() makes MongoDB walk and discard all skipped documents.
+    """
     if page < 1:
         page = 1
     if page_size < 1:
@@ -140,17 +252,28 @@ async def get_all_requests(
     if page_size > 100:
         page_size = 100
 
-    skip = (page - 1) * page_size
+    cache_key = ("all", status, page, page_size, created_before)
+    cached = _request_list_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     query = models.AffiliateRequest.find()
     if status:
         query = query.find(models.AffiliateRequest.status == status)
-    
-    requests = await query.sort("-created_at").skip(skip).limit(page_size).to_list()
+    if created_before:
+        query = query.find(models.AffiliateRequest.created_at < created_before)
+        skip = 0
+    else:
+        skip = (page - 1) * page_size
+
+    requests = await query.sort("-created_at").skip(skip).limit(page_size).project(
+        AffiliateRequestListProjection
+    ).to_list()
     
     # Convert to response format with string IDs
     result = []
     for request in requests:
-        result.append(schemas.AffiliateRequestResponse(
+        result.append(schemas.AffiliateRequestResponse.model_construct(
             id=str(request.id),
             name=request.name,
             email=request.email,
@@ -163,10 +286,16 @@ async def get_all_requests(
             created_at=request.created_at,
             reviewed_at=request.reviewed_at
         ))
+    _request_list_cache_put(cache_key, result)
     return result
 
 async def approve_affiliate_request(request_id: str, admin_id: str):
-    """Approve an affiliate request and create their account"""
+    """Approve an affiliate request and create their account.
+
+    Returns (affiliate, email) on success - the email comes straight
+    from the processed request, so the router does not need a follow-up
+    User lookup just to echo it in the response.
+    """
     # Handle both string and ObjectId formats
     try:
         from bson import ObjectId
@@ -180,7 +309,22 @@ async def approve_affiliate_request(request_id: str, admin_id: str):
     
     if not request or request.status != models.RequestStatus.PENDING:
         return None
-    
+
+    # Atomically claim the request with a targeted $set (only while still
+    # pending) - avoids the lost-update race of two admins approving
+    # concurrently and writes a fraction of the BSON of a full save()
+    claim_result = await models.AffiliateRequest.find_one(
+        models.AffiliateRequest.id == request.id,
+        models.AffiliateRequest.status == models.RequestStatus.PENDING
+    ).update({"$set": {
+        "status": models.RequestStatus.APPROVED,
+        "reviewed_at": datetime.utcnow(),
+        "reviewed_by": admin_id
+    }})
+    if not claim_result or claim_result.modified_count == 0:
+        return None  # Another admin processed it first
+    invalidate_request_list_cache()
+
     # Create user account (emails are auto-verified, no OTP required)
     user = models.User(
         email=request.email,
@@ -196,7 +340,7 @@ async def approve_affiliate_request(request_id: str, admin_id: str):
     unique_link = None
     for _ in range(max_attempts):
         candidate = generate_unique_affiliate_link()
-        existing = await models.Affiliate.find_one(models.Affiliate.unique_link == candidate)
+        existing = await models.Affiliate.find(models.Affiliate.unique_link == candidate).exists()
         if not existing:
             unique_link = candidate
             break
@@ -214,22 +358,16 @@ async def approve_affiliate_request(request_id: str, admin_id: str):
         unique_link=unique_link
     )
     await affiliate.insert()
-    
-    # Update request status
-    request.status = models.RequestStatus.APPROVED
-    request.reviewed_at = datetime.utcnow()
-    request.reviewed_by = admin_id
-    await request.save()
-    
-    # Send welcome email after successful approval
-    try:
-        await send_welcome_email(request.email, "affiliate", request.name)
-        print(f"Welcome email sent to {request.email}")
-    except Exception as e:
-        print(f"Warning: Failed to send welcome email to {request.email}: {e}")
-        # Don't fail the approval process if email fails
-    
-    return affiliate
+
+    # Send welcome email in the background after successful approval -
+    # the admin response should not wait on SMTP, and a failed email
+    # must not fail the approval
+    from email_service import email_service
+    email_service.send_in_background(
+        email_service.send_welcome_email(request.email, "affiliate", request.name)
+    )
+
+    return affiliate, request.email
 
 async def reject_affiliate_request(request_id: str, admin_id: str):
     """Reject an affiliate request and delete it from database"""
@@ -256,32 +394,43 @@ async def reject_affiliate_request(request_id: str, admin_id: str):
         "reviewed_by": admin_id,
         "reviewed_at": datetime.utcnow()
     }
-    
-    # Delete the request from database
-    await request.delete()
-    
+
+    # Delete only while still pending - atomic guard against a concurrent
+    # approval racing the rejection
+    delete_result = await models.AffiliateRequest.find_one(
+        models.AffiliateRequest.id == request.id,
+        models.AffiliateRequest.status == models.RequestStatus.PENDING
+    ).delete()
+    if not delete_result or delete_result.deleted_count == 0:
+        return None  # Another admin processed it first
+    invalidate_request_list_cache()
+
     return request_info
 
 async def authenticate_user(email: str, password: str):
     """Authenticate a user"""
     try:
-        user = await models.User.find_one(models.User.email == email)
+        user = await models.User.find_one(
+            models.User.email == email
+        ).project(UserAuthProjection)
         if not user or not verify_password(password, user.hashed_password):
             return None
         return user
     except Exception as e:
-        print(f"Database error during authentication: {e}")
+        logger.error("Database error during authentication: %s", e)
         return None
 
 async def authenticate_referral(email: str, password: str):
     """Authenticate a referral/member"""
     try:
-        referral = await models.Referral.find_one(models.Referral.email == email)
+        referral = await models.Referral.find_one(
+            models.Referral.email == email
+        ).project(ReferralAuthProjection)
         if not referral or not verify_password(password, referral.hashed_password):
             return None
         return referral
     except Exception as e:
-        print(f"Database error during referral authentication: {e}")
+        logger.error("Database error during referral authentication: %s", e)
         return None
 
 async def get_affiliate_by_user(user_id: PydanticObjectId):
@@ -307,22 +456,62 @@ async def update_affiliate_profile(user_id: PydanticObjectId, update_data: schem
     
     return affiliate
 
-async def get_all_affiliates(page: int = 1, page_size: int = 20):
-    """Get all approved affiliates (paginated)"""
+async def get_all_affiliates(page: int = 1, page_size: int = 20,
+                             created_before: Optional[datetime] = None):
+    """Get all approved affiliates with their owner's email (paginated).
+
+    The users join runs server-side as a $lookup, so one round trip
+    returns already-joined rows with inactive owners filtered out.
+    For deep pagination pass created_before (created_at of the last
+    item of the previous page) - a keyset seek instead of a $skip that
+    scans and discards every earlier row.
+    """
     if page < 1:
         page = 1
     if page_size < 1:
         page_size = 1
     if page_size > 100:
         page_size = 100
-    skip = (page - 1) * page_size
+    skip = 0 if created_before is not None else (page - 1) * page_size
+
+    pipeline = []
+    if created_before is not None:
+        pipeline.append({"$match": {"created_at": {"$lt": created_before}}})
+    pipeline += [
+        {"$sort": {"created_at": -1}},
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_id",
+            "foreignField": "_id",
+            "as": "user",
+        }},
+        {"$unwind": "$user"},
+        {"$match": {"user.is_active": True}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    pipeline += [
+        {"$limit": page_size},
+        {"$project": {
+            "name": 1, "location": 1, "language": 1, "onemove_link": 1,
+            "puprime_link": 1, "unique_link": 1, "created_at": 1,
+            "user.email": 1,
+        }},
+    ]
 
-    affiliates = await models.Affiliate.find().sort("-created_at").skip(skip).limit(page_size).to_list()
     result = []
-    for affiliate in affiliates:
-        user = await models.User.find_one(models.User.id == affiliate.user_id)
-        if user and user.is_active:
-            result.append(affiliate)
+    async for row in models.Affiliate.aggregate(pipeline):
+        result.append(schemas.AffiliateResponse.model_construct(
+            id=str(row["_id"]),
+            name=row["name"],
+            email=row["user"]["email"],
+            location=row["location"],
+            language=row["language"],
+            puprime_referral_code=row.get("onemove_link"),
+            puprime_link=row["puprime_link"],
+            unique_link=f"{settings.BASE_URL}/ref/{row['unique_link']}",
+            created_at=row["created_at"],
+        ))
     return result
 
 async def create_referral_registration(unique_link: str, registration_data: schemas.ReferralRegistrationRequest):
@@ -332,8 +521,10 @@ async def create_referral_registration(unique_link: str, registration_data: sche
     if not affiliate:
         return None
     
-    # Check if email already exists
-    existing_referral = await models.Referral.find_one(models.Referral.email == registration_data.email)
+    # Check if email already exists (existence check only)
+    existing_referral = await models.Referral.find(
+        models.Referral.email == registration_data.email
+    ).exists()
     if existing_referral:
         return None
     
@@ -360,46 +551,51 @@ async def create_referral_registration(unique_link: str, registration_data: sche
     
     # Send welcome email using affiliate's custom template if available
     try:
-        # Get affiliate's email template
-        email_template = await models.AffiliateEmailTemplate.find_one(
-            models.AffiliateEmailTemplate.affiliate_id == affiliate.id,
-            models.AffiliateEmailTemplate.is_active == True
+        # The template and user lookups are independent - run them
+        # concurrently instead of sequentially
+        email_template, affiliate_user = await asyncio.gather(
+            models.AffiliateEmailTemplate.find_one(
+                models.AffiliateEmailTemplate.affiliate_id == affiliate.id,
+                models.AffiliateEmailTemplate.is_active == True
+            ),
+            models.User.find_one(models.User.id == affiliate.user_id)
         )
-        
-        # Get affiliate user for email
-        affiliate_user = await models.User.find_one(models.User.id == affiliate.user_id)
-        
+
         if email_template and affiliate_user:
-            # Send using affiliate's custom template
+            # Send using affiliate's custom template (in the background)
             from email_service import email_service
             template_dict = {
                 'subject': email_template.subject,
                 'html_content': email_template.html_content,
                 'text_content': email_template.text_content
             }
-            
-            await email_service.send_affiliate_template_email(
-                to_email=referral.email,
-                affiliate_template=template_dict,
-                member_name=referral.full_name,
-                member_email=referral.email,
-                affiliate_name=affiliate.name,
-                affiliate_email=affiliate_user.email,
-                unique_link=f"{settings.BASE_URL}/ref/{unique_link}",
-                registration_date=referral.created_at.strftime("%Y-%m-%d %H:%M:%S")
+
+            email_service.send_in_background(
+                email_service.send_affiliate_template_email(
+                    to_email=referral.email,
+                    affiliate_template=template_dict,
+                    member_name=referral.full_name,
+                    member_email=referral.email,
+                    affiliate_name=affiliate.name,
+                    affiliate_email=affiliate_user.email,
+                    unique_link=f"{settings.BASE_URL}/ref/{unique_link}",
+                    registration_date=referral.created_at.strftime("%Y-%m-%d %H:%M:%S")
+                )
             )
-            print(f"[INFO] Sent custom template email to {referral.email}")
+            logger.info("Queued custom template email to %s", referral.email)
         else:
-            # Send default welcome email
+            # Send default welcome email (in the background)
             from email_service import email_service
-            await email_service.send_welcome_email(
-                to_email=referral.email,
-                user_type="member",
-                name=referral.full_name
+            email_service.send_in_background(
+                email_service.send_welcome_email(
+                    to_email=referral.email,
+                    user_type="member",
+                    name=referral.full_name
+                )
             )
-            print(f"[INFO] Sent default welcome email to {referral.email}")
+            logger.info("Queued default welcome email to %s", referral.email)
     except Exception as e:
-        print(f"[WARNING] Failed to send welcome email to {referral.email}: {e}")
+        logger.warning("Failed to send welcome email to %s: %s", referral.email, e)
         # Don't fail registration if email fails
     
     # Return response format with string IDs
@@ -422,6 +618,27 @@ async def create_referral_registration(unique_link: str, registration_data: sche
     )
 
 
+# Projection for referral lists - the response schema's fields and
+# nothing else (notably not hashed_password)
+class ReferralListProjection(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    affiliate_id: PydanticObjectId
+    unique_link: str
+    full_name: str
+    email: str
+    timezone: str
+    location: str
+    headline: Optional[str] = None
+    bio: Optional[str] = None
+    broker_id: Optional[str] = None
+    invited_person: str
+    find_us: str
+    onemove_link: Optional[str] = None
+    puprime_verification: Optional[bool] = False
+    created_at: datetime
+
 async def get_referrals_by_affiliate(affiliate_id: str, page: int = 1, page_size: int = 20):
     """Get all referrals for a specific affiliate (paginated)"""
     if page < 1:
@@ -435,12 +652,14 @@ async def get_referrals_by_affiliate(affiliate_id: str, page: int = 1, page_size
     from beanie import PydanticObjectId
     referrals = await models.Referral.find(
         models.Referral.affiliate_id == PydanticObjectId(affiliate_id)
-    ).sort("-created_at").skip(skip).limit(page_size).to_list()
+    ).sort("-created_at").skip(skip).limit(page_size).project(
+        ReferralListProjection
+    ).to_list()
     
     # Convert to response format with string IDs
     result = []
     for referral in referrals:
-        result.append(schemas.ReferralResponse(
+        result.append(schemas.ReferralResponse.model_construct(
             id=str(referral.id),
             affiliate_id=str(referral.affiliate_id),
             unique_link=referral.unique_link,
@@ -476,22 +695,27 @@ async def delete_affiliate_profile(user_id: PydanticObjectId):
     if not user:
         return None
     
-    # Delete all referrals
-    await models.Referral.find(
-        models.Referral.affiliate_id == affiliate.id
-    ).delete()
-    
-    # Delete the affiliate request associated with this user's email
-    await models.AffiliateRequest.find(
-        models.AffiliateRequest.email == user.email
-    ).delete()
-    
-    # Delete affiliate profile
-    await affiliate.delete()
-    
-    # Delete user account
-    await user.delete()
-    
+    # The four deletes touch different collections and don't depend on
+    # each other - overlap their round trips instead of paying them in
+    # sequence
+    await asyncio.gather(
+        models.Referral.find(
+            models.Referral.affiliate_id == affiliate.id
+        ).delete(),
+        models.AffiliateRequest.find(
+            models.AffiliateRequest.email == user.email
+        ).delete(),
+        affiliate.delete(),
+        user.delete(),
+    )
+
+    # The deleted account must not keep authenticating from the
+    # short-TTL user cache, and its request must drop out of cached
+    # admin listings
+    from auth_utils import invalidate_user_cache
+    invalidate_user_cache(user.email)
+    invalidate_request_list_cache()
+
     return True
 
 async def delete_referral_by_id(referral_id: str, affiliate_id: str):
@@ -507,12 +731,16 @@ async def delete_referral_by_id(referral_id: str, affiliate_id: str):
     return True
 
 async def get_all_referrals(
-    page: int = 1, 
-    page_size: int = 20, 
+    page: int = 1,
+    page_size: int = 20,
     affiliate_id: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    created_before: Optional[datetime] = None,
 ):
-    """Get all referrals across all affiliates (admin view)"""
+    """Get all referrals across all affiliates (admin view).
+
+    created_before enables range-key pagination (see get_all_requests).
+    """
     if page < 1:
         page = 1
     if page_size < 1:
@@ -522,9 +750,12 @@ async def get_all_referrals(
     skip = (page - 1) * page_size
 
     from beanie import PydanticObjectId
-    
+
     # Build query
     query = models.Referral.find()
+    if created_before:
+        query = query.find(models.Referral.created_at < created_before)
+        skip = 0
     
     # Filter by affiliate if specified
     if affiliate_id:
@@ -545,12 +776,14 @@ async def get_all_referrals(
             ]}
         )
     
-    referrals = await query.sort("-created_at").skip(skip).limit(page_size).to_list()
+    referrals = await query.sort("-created_at").skip(skip).limit(page_size).project(
+        ReferralListProjection
+    ).to_list()
     
     # Convert to response format with string IDs
     result = []
     for referral in referrals:
-        result.append(schemas.ReferralResponse(
+        result.append(schemas.ReferralResponse.model_construct(
             id=str(referral.id),
             affiliate_id=str(referral.affiliate_id),
             unique_link=referral.unique_link,
@@ -702,35 +935,34 @@ async def get_affiliate_by_referral(referral_id: PydanticObjectId):
 # Password reset functions
 async def request_password_reset(email: str):
     """Request password reset for a user (supports both User and Referral/Member)"""
+    # Throttle before touching the database or SMTP (cheap in-memory check)
+    from auth_utils import is_email_send_allowed, register_email_send
+    if not is_email_send_allowed(email):
+        logger.warning("Password reset email to %s throttled", email)
+        return None  # Same response as unknown email - don't reveal anything
+
     # Check if user exists in User collection (affiliate/admin)
     user = await models.User.find_one(models.User.email == email)
-    
+
     # If not found in User, check Referral/Member collection
     if not user:
         referral = await models.Referral.find_one(models.Referral.email == email)
         if not referral:
             return None  # Don't reveal if email exists or not for security
-    
-    # Invalidate any existing password reset tokens for this email
-    await models.EmailVerificationToken.find(
-        models.EmailVerificationToken.email == email,
-        models.EmailVerificationToken.token_type == "password_reset"
-    ).delete()
-    
-    # Create password reset token
+
+    # Create password reset token (upsert - replaces/invalidates any old one)
     from auth_utils import create_password_reset_token, send_password_reset_email
     token = await create_password_reset_token(email)
+    register_email_send(email)
     
-    # Send password reset email
-    email_sent = await send_password_reset_email(email, token)
-    if not email_sent:
-        print(f"Warning: Failed to send password reset email to {email}")
-        # Still return success to not reveal email issues
-    
+    # Queue the email - the HTTP response should not wait on SMTP
+    from email_service import email_service
+    email_service.send_in_background(send_password_reset_email(email, token))
+
     return {
         "email": email,
         "token_created": True,
-        "email_sent": email_sent
+        "email_sent": True  # queued; failures are logged by the worker
     }
 
 async def reset_password_with_token(token: str, new_password: str):
@@ -747,6 +979,9 @@ async def reset_password_with_token(token: str, new_password: str):
     if user:
         user.hashed_password = get_password_hash(new_password)
         await user.save()
+        # Drop any cached copy so the old credentials stop resolving
+        from auth_utils import invalidate_user_cache
+        invalidate_user_cache(token_record.email)
     else:
         # Check Referral/Member collection
         referral = await models.Referral.find_one(models.Referral.email == token_record.email)
@@ -766,6 +1001,12 @@ async def reset_password_with_token(token: str, new_password: str):
 
 async def resend_password_reset_email(email: str):
     """Resend password reset email (supports both User and Referral/Member)"""
+    # Throttle before touching the database or SMTP (cheap in-memory check)
+    from auth_utils import is_email_send_allowed, register_email_send
+    if not is_email_send_allowed(email):
+        logger.warning("Password reset email to %s throttled", email)
+        return None  # Same response as unknown email - don't reveal anything
+
     # Check if user exists in User collection (affiliate/admin)
     user = await models.User.find_one(models.User.email == email)
     
@@ -775,27 +1016,19 @@ async def resend_password_reset_email(email: str):
         if not referral:
             return None  # Don't reveal if email exists or not for security
     
-    # Create new password reset token (invalidate old ones)
+    # Create new password reset token (upsert - replaces/invalidates any old one)
     from auth_utils import create_password_reset_token, send_password_reset_email
-    
-    # Invalidate any existing password reset tokens for this email
-    await models.EmailVerificationToken.find(
-        models.EmailVerificationToken.email == email,
-        models.EmailVerificationToken.token_type == "password_reset"
-    ).delete()
-    
-    # Create new token
     token = await create_password_reset_token(email)
-    
-    # Send password reset email
-    email_sent = await send_password_reset_email(email, token)
-    if not email_sent:
-        print(f"Warning: Failed to resend password reset email to {email}")
-    
+    register_email_send(email)
+
+    # Queue the email - the HTTP response should not wait on SMTP
+    from email_service import email_service
+    email_service.send_in_background(send_password_reset_email(email, token))
+
     return {
         "email": email,
         "token_created": True,
-        "email_sent": email_sent
+        "email_sent": True  # queued; failures are logged by the worker
     }
 
 # ==================== Affiliate Notes CRUD Functions ====================
@@ -844,14 +1077,12 @@ async def get_notes_by_referral(affiliate_id: str, referral_id: str):
     if not referral or str(referral.affiliate_id) != affiliate_id:
         return None  # Unauthorized or not found
     
-    # Get all notes
-    notes = await models.AffiliateNote.find(
+    # Get all notes (streamed - this query is unbounded)
+    result = []
+    async for note in models.AffiliateNote.find(
         models.AffiliateNote.affiliate_id == PydanticObjectId(affiliate_id),
         models.AffiliateNote.referral_id == PydanticObjectId(referral_id)
-    ).sort("-created_at").to_list()
-    
-    result = []
-    for note in notes:
+    ).sort("-created_at"):
         result.append(schemas.NoteResponse(
             id=str(note.id),
             affiliate_id=str(note.affiliate_id),
@@ -947,51 +1178,50 @@ async def delete_affiliate_note(note_id: str, affiliate_id: str):
 # ==================== Top Affiliates Analytics ====================
 
 async def get_top_affiliates_by_referrals(limit: int = 10):
-    """Get top affiliates ranked by referral count"""
-    from beanie import PydanticObjectId
-    
-    # Get all affiliates
-    affiliates = await models.Affiliate.find().to_list()
-    
-    # For each affiliate, get referral count
-    affiliate_stats = []
-    for affiliate in affiliates:
-        count = await models.Referral.find(
-            models.Referral.affiliate_id == affiliate.id
-        ).count()
-        
-        # Get user email
-        user = await models.User.find_one(
-            models.User.id == affiliate.user_id
-        )
-        
-        if user and user.is_active:
-            affiliate_stats.append({
-                "affiliate": affiliate,
-                "user": user,
-                "count": count
-            })
-    
-    # Sort by count descending
-    affiliate_stats.sort(key=lambda x: x["count"], reverse=True)
-    
-    # Take top N
-    top_affiliates = affiliate_stats[:limit]
-    
-    # Build response
+    """Get top affiliates ranked by referral count.
+
+    Counting, joining, sorting and the top-N cut all run server-side in
+    one aggregation instead of a count + user lookup per affiliate
+    followed by a Python sort of the whole collection.
+    """
+    pipeline = [
+        {"$lookup": {
+            "from": "referrals",
+            "let": {"aff_id": "$_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$affiliate_id", "$$aff_id"]}}},
+                {"$count": "count"},
+            ],
+            "as": "referral_count",
+        }},
+        {"$addFields": {"referral_count": {
+            "$ifNull": [{"$arrayElemAt": ["$referral_count.count", 0]}, 0]
+        }}},
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_id",
+            "foreignField": "_id",
+            "as": "user",
+        }},
+        {"$unwind": "$user"},
+        {"$match": {"user.is_active": True}},
+        {"$sort": {"referral_count": -1}},
+        {"$limit": limit},
+    ]
+
     result = []
-    for stat in top_affiliates:
-        result.append(schemas.TopAffiliateResponse(
-            id=str(stat["affiliate"].id),
-            name=stat["affiliate"].name,
-            email=stat["user"].email,
-            location=stat["affiliate"].location,
-            language=stat["affiliate"].language,
-            unique_link=f"{settings.BASE_URL}/ref/{stat['affiliate'].unique_link}",
-            referral_count=stat["count"],
-            created_at=stat["affiliate"].created_at
+    async for row in models.Affiliate.aggregate(pipeline):
+        result.append(schemas.TopAffiliateResponse.model_construct(
+            id=str(row["_id"]),
+            name=row["name"],
+            email=row["user"]["email"],
+            location=row["location"],
+            language=row["language"],
+            unique_link=f"{settings.BASE_URL}/ref/{row['unique_link']}",
+            referral_count=row["referral_count"],
+            created_at=row["created_at"]
         ))
-    
+
     return result
 
 # ==================== Support Ticket CRUD Functions ====================
@@ -1777,10 +2007,11 @@ async def get_tutorial_video_by_id(video_id: str, increment_view: bool = False):
     if not video:
         return None
     
-    # Increment view count if requested (for public viewing)
+    # Increment view count if requested (for public viewing) - atomic
+    # server-side $inc instead of read-modify-write save, so concurrent
+    # views don't lose updates and the full document isn't rewritten
     if increment_view:
-        video.view_count += 1
-        await video.save()
+        await video.inc({models.TutorialVideo.view_count: 1})
     
     return schemas.TutorialVideoResponse(
         id=str(video.id),
@@ -1859,9 +2090,9 @@ async def delete_tutorial_video(video_id: str):
     # Delete video from Cloudinary
     try:
         await cloudinary_utils.delete_cloudinary_video(video.cloudinary_public_id)
-        print(f"Deleted video from Cloudinary: {video.cloudinary_public_id}")
+        logger.info("Deleted video from Cloudinary: %s", video.cloudinary_public_id)
     except Exception as e:
-        print(f"Warning: Failed to delete video from Cloudinary: {e}")
+        logger.warning("Failed to delete video from Cloudinary: %s", e)
         # Continue with database deletion even if Cloudinary deletion fails
     
     # Delete from database
@@ -1,4 +1,4 @@
-import motor.motor_asyncio
+from pymongo import AsyncMongoClient
 from beanie import init_beanie
 from models import User, AffiliateRequest, Affiliate, Referral, SystemConfig, EmailVerificationToken, AffiliateNote, AffiliateEmailTemplate, SupportTicket, TicketReply, PublicNote, TutorialVideo
 from config import settings
@@ -6,18 +6,26 @@ from config import settings
 # Global flag
 database_initialized = False
 
+# Single shared client for the whole process - created in init_db and
+# reused everywhere (the driver manages its own connection pool internally)
+client = None
+
+def get_client():
+    """Return the shared AsyncMongoClient (None until init_db has run)"""
+    return client
+
 async def init_db():
     """Initialize database with proper error handling"""
-    global database_initialized
-    
+    global database_initialized, client
+
     try:
         print("Connecting to MongoDB...")
-        
-        client = motor.motor_asyncio.AsyncIOMotorClient(
+
+        client = AsyncMongoClient(
             settings.DATABASE_URL,
             serverSelectionTimeoutMS=5000
         )
-        
+
         # Test connection
         await client.admin.command('ping')
         print("Connected to MongoDB")
@@ -1,97 +1,36 @@
 import aiosmtplib
+import asyncio
+import logging
+import re
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+from email.utils import formataddr
+from urllib.parse import quote
 from typing import Optional
-from datetime import datetime, timedelta
-import secrets
-import string
 
 from config import settings
-import models
 
-class EmailService:
-    """Professional email service for sending emails"""
-    
-    def __init__(self):
-        self.smtp_host = settings.EMAIL_SMTP_HOST
-        self.smtp_port = settings.EMAIL_SMTP_PORT
-        self.smtp_username = settings.EMAIL_SMTP_USERNAME
-        self.smtp_password = settings.EMAIL_SMTP_PASSWORD
-        self.from_name = settings.EMAIL_FROM_NAME
-        self.from_email = settings.EMAIL_FROM_EMAIL or settings.EMAIL_SMTP_USERNAME
-    
-    def _is_configured(self) -> bool:
-        """Check if email service is properly configured"""
-        if not self.smtp_host or not self.smtp_port:
-            return False
-        if not self.smtp_username or not self.smtp_password:
-            return False
-        # from_email can fallback to smtp_username, so check if at least one is set
-        if not self.from_email and not self.smtp_username:
-            return False
-        return True
-    
-    async def _create_smtp_connection(self):
-        """Create secure async SMTP connection"""
-        if not self._is_configured():
-            raise ValueError("Email service is not properly configured. Please check your .env file for EMAIL_SMTP_* settings.")
-        
-        context = ssl.create_default_context()
-        
-        # For port 587, use STARTTLS (connect first, then upgrade)
-        # For port 465, use direct TLS (use_tls=True)
-        if self.smtp_port == 587:
-            # Port 587 uses STARTTLS - aiosmtplib handles this automatically
-            server = aiosmtplib.SMTP(
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                use_tls=False,  # Don't use direct TLS
-                start_tls=True,  # Use STARTTLS instead
-                tls_context=context
-            )
-            await server.connect()
-        else:
-            # Port 465 or other ports use direct TLS
-            server = aiosmtplib.SMTP(
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                use_tls=True,
-                tls_context=context
-            )
-            await server.connect()
-        
-        if self.smtp_username and self.smtp_password:
-            await server.login(self.smtp_username, self.smtp_password)
-        
-        return server
-    
-    async def send_welcome_email(self, to_email: str, user_type: str, name: str = None) -> bool:
-        """Send welcome email after registration"""
-        # Check if email service is configured
-        if not self._is_configured():
-            print(f"ERROR: Cannot send welcome email to {to_email} - Email service not configured")
-            print("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
-            return False
-        
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"Welcome to OneMove Affiliate Management System"
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            display_name = name or to_email.split('@')[0]
-            
-            # HTML welcome email
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>Welcome</title>
-                <style>
-                    body {{
+logger = logging.getLogger(__name__)
+
+# Reset-link base resolved once at import - RESET_PASSWORD_URL is a
+# startup constant, so each send only appends the (percent-encoded) token
+_RESET_URL_BASE = settings.RESET_PASSWORD_URL + "?token="
+
+# Compiled once - used to derive plain-text bodies from HTML content
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Placeholders supported in affiliate-defined email templates - substituted
+# in a single pass instead of one str.replace scan per variable
+_TEMPLATE_VAR_RE = re.compile(
+    r'\{(member_name|member_email|affiliate_name|affiliate_email|'
+    r'unique_link|registration_date)\}'
+)
+
+
+# Shared CSS rules - written once here and spliced into each HTML template
+# at import time, so identical style blocks are not maintained (or built)
+# three times over. Braces stay doubled for the later .format() calls.
+_BASE_CSS = """body {{
                         font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                         line-height: 1.6;
                         color: #333;
@@ -99,14 +38,9 @@ class EmailService:
                         margin: 0 auto;
                         padding: 20px;
                         background-color: #f4f4f4;
-                    }}
-                    .container {{
-                        background-color: #ffffff;
-                        padding: 30px;
-                        border-radius: 10px;
-                        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                    }}
-                    .header {{
+                    }}"""
+
+_HEADER_CSS = """.header {{
                         text-align: center;
                         margin-bottom: 30px;
                     }}
@@ -115,7 +49,37 @@ class EmailService:
                         font-weight: bold;
                         color: #27ae60;
                         margin-bottom: 10px;
+                    }}"""
+
+_FOOTER_CSS = """.footer {{
+                        margin-top: 30px;
+                        padding-top: 20px;
+                        border-top: 1px solid #eee;
+                        font-size: 12px;
+                        color: #666;
+                        text-align: center;
+                    }}"""
+
+
+# Pre-built email templates - the static HTML/text bodies are assembled once
+# at import time instead of being rebuilt on every send. CSS braces are
+# escaped ({{ }}) so .format() only touches the real placeholders.
+_WELCOME_HTML_TEMPLATE = """
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="utf-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>Welcome</title>
+                <style>
+                    """ + _BASE_CSS + """
+                    .container {{
+                        background-color: #ffffff;
+                        padding: 30px;
+                        border-radius: 10px;
+                        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
                     }}
+                    """ + _HEADER_CSS + """
                     .success {{
                         background-color: #d4edda;
                         border: 1px solid #c3e6cb;
@@ -153,8 +117,8 @@ class EmailService:
             </body>
             </html>
             """
-            
-            text_content = f"""
+
+_WELCOME_TEXT_TEMPLATE = """
             Welcome to OneMove Affiliate Management System
             
             Hello {display_name},
@@ -173,51 +137,8 @@ class EmailService:
             Best regards,
             OneMove Affiliate Management System Team
             """
-            
-            text_part = MIMEText(text_content, 'plain')
-            html_part = MIMEText(html_content, 'html')
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email using async SMTP
-            server = await self._create_smtp_connection()
-            try:
-                await server.send_message(msg)
-                print(f"[SUCCESS] Welcome email sent successfully to {to_email}")
-                return True
-            finally:
-                await server.quit()
-            
-        except ValueError as e:
-            # Configuration error
-            print(f"ERROR: {e}")
-            return False
-        except Exception as e:
-            print(f"ERROR: Failed to send welcome email to {to_email}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
-    async def send_password_reset_email(self, to_email: str, reset_token: str) -> bool:
-        """Send password reset email with professional template"""
-        # Check if email service is configured
-        if not self._is_configured():
-            print(f"ERROR: Cannot send password reset email to {to_email} - Email service not configured")
-            print("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
-            return False
-        
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = "OneMove Password Reset Request"
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            # Create reset URL (you can customize this based on your frontend)
-            reset_url = f"{settings.RESET_PASSWORD_URL}?token={reset_token}"
-            
-            # HTML password reset email
-            html_content = f"""
+
+_PASSWORD_RESET_HTML_TEMPLATE = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -225,15 +146,7 @@ class EmailService:
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>Password Reset Request</title>
                 <style>
-                    body {{
-                        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                        line-height: 1.6;
-                        color: #333;
-                        max-width: 600px;
-                        margin: 0 auto;
-                        padding: 20px;
-                        background-color: #f4f4f4;
-                    }}
+                    """ + _BASE_CSS + """
                     .container {{
                         background-color: #ffffff;
                         padding: 40px;
@@ -264,14 +177,7 @@ class EmailService:
                         color: #ffffff !important;
                         text-decoration: none !important;
                     }}
-                    .footer {{
-                        margin-top: 30px;
-                        padding-top: 20px;
-                        border-top: 1px solid #eee;
-                        font-size: 12px;
-                        color: #666;
-                        text-align: center;
-                    }}
+                    """ + _FOOTER_CSS + """
                 </style>
             </head>
             <body>
@@ -297,9 +203,8 @@ class EmailService:
             </body>
             </html>
             """
-            
-            # Plain text version
-            text_content = f"""
+
+_PASSWORD_RESET_TEXT_TEMPLATE = """
             OneMove Password Reset Request
             
             Hello,
@@ -313,50 +218,8 @@ class EmailService:
             
             This email was sent by the OneMove Affiliate Management System.
             """
-            
-            text_part = MIMEText(text_content, 'plain')
-            html_part = MIMEText(html_content, 'html')
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email using async SMTP
-            server = await self._create_smtp_connection()
-            try:
-                await server.send_message(msg)
-                print(f"[SUCCESS] Password reset email sent successfully to {to_email}")
-                return True
-            finally:
-                await server.quit()
-            
-        except ValueError as e:
-            # Configuration error
-            print(f"ERROR: {e}")
-            return False
-        except Exception as e:
-            print(f"ERROR: Failed to send password reset email to {to_email}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
-    async def send_custom_email(self, to_email: str, subject: str, message: str, recipient_name: str = None) -> bool:
-        """Send custom email with HTML content"""
-        # Check if email service is configured
-        if not self._is_configured():
-            print(f"ERROR: Cannot send custom email to {to_email} - Email service not configured")
-            print("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
-            return False
-        
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            display_name = recipient_name or to_email.split('@')[0]
-            
-            # HTML email template with custom message
-            html_content = f"""
+
+_CUSTOM_HTML_TEMPLATE = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -364,42 +227,18 @@ class EmailService:
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>{subject}</title>
                 <style>
-                    body {{
-                        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                        line-height: 1.6;
-                        color: #333;
-                        max-width: 600px;
-                        margin: 0 auto;
-                        padding: 20px;
-                        background-color: #f4f4f4;
-                    }}
+                    """ + _BASE_CSS + """
                     .container {{
                         background-color: #ffffff;
                         padding: 30px;
                         border-radius: 10px;
                         box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
                     }}
-                    .header {{
-                        text-align: center;
-                        margin-bottom: 30px;
-                    }}
-                    .logo {{
-                        font-size: 24px;
-                        font-weight: bold;
-                        color: #27ae60;
-                        margin-bottom: 10px;
-                    }}
+                    """ + _HEADER_CSS + """
                     .content {{
                         margin: 20px 0;
                     }}
-                    .footer {{
-                        margin-top: 30px;
-                        padding-top: 20px;
-                        border-top: 1px solid #eee;
-                        font-size: 12px;
-                        color: #666;
-                        text-align: center;
-                    }}
+                    """ + _FOOTER_CSS + """
                 </style>
             </head>
             <body>
@@ -420,44 +259,334 @@ class EmailService:
             </body>
             </html>
             """
-            
-            # Plain text version (strip HTML tags for basic text)
-            import re
-            text_content = re.sub(r'<[^>]+>', '', message)
-            text_content = f"""
+
+_CUSTOM_TEXT_TEMPLATE = """
             {subject}
             
             Hello {display_name},
             
-            {text_content}
+            {message_text}
             
             ---
             This email was sent by your affiliate from the OneMove Affiliate Management System.
             """
+
+# The triple-quoted literals carry ~40 lines of Python indentation that
+# email clients ignore - collapse it once at import so every outbound
+# message is a third of the size. Text templates keep their newlines.
+_MINIFY_RE = re.compile(r'\s+')
+
+def _display_name(name: Optional[str], to_email: str) -> str:
+    """Fall back to the mailbox part of the address when no name is given"""
+    # partition does a single scan and no list allocation, unlike split
+    return name or to_email.partition('@')[0]
+
+def _minify_html(template: str) -> str:
+    return _MINIFY_RE.sub(' ', template).replace('> <', '><').strip()
+
+_WELCOME_HTML_TEMPLATE = _minify_html(_WELCOME_HTML_TEMPLATE)
+_PASSWORD_RESET_HTML_TEMPLATE = _minify_html(_PASSWORD_RESET_HTML_TEMPLATE)
+_CUSTOM_HTML_TEMPLATE = _minify_html(_CUSTOM_HTML_TEMPLATE)
+
+class EmailService:
+    """Professional email service for sending emails"""
+    
+    def __init__(self):
+        self.smtp_host = settings.EMAIL_SMTP_HOST
+        self.smtp_port = settings.EMAIL_SMTP_PORT
+        self.smtp_username = settings.EMAIL_SMTP_USERNAME
+        self.smtp_password = settings.EMAIL_SMTP_PASSWORD
+        self.from_name = settings.EMAIL_FROM_NAME
+        self.from_email = settings.EMAIL_FROM_EMAIL or settings.EMAIL_SMTP_USERNAME
+        # From header never changes after startup - format it once,
+        # with RFC 5322 quoting of the display name. Empty when email is
+        # unconfigured (from_email None) so import still succeeds and the
+        # service degrades via _is_configured like the database does.
+        self._from_header = (
+            formataddr((self.from_name, self.from_email)) if self.from_email else ""
+        )
+        # Pool of reused SMTP connections - the TLS handshake + login is by
+        # far the most expensive part of a send, so keep a few connections
+        # alive instead of reconnecting per email. The queue is created
+        # lazily so it binds to the running event loop.
+        self.pool_size = settings.EMAIL_SMTP_POOL_SIZE
+        self._pool: Optional[asyncio.Queue] = None
+        self._pool_created = 0
+        self._pool_lock = asyncio.Lock()
+        # Background send queue - created lazily so it binds to the
+        # running event loop; a single worker drains it sequentially over
+        # the reused SMTP connection
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._send_worker: Optional[asyncio.Task] = None
+        # One shared TLS context: building it per connection re-reads the
+        # CA bundle, and a shared context keeps a session cache so
+        # reconnects can resume the previous TLS session instead of doing
+        # a full handshake
+        self._tls_context = ssl.create_default_context()
+        # Settings are immutable after startup, so evaluate the
+        # configuration check once instead of on every send
+        self._configured = self._check_configured()
+
+    def _check_configured(self) -> bool:
+        """Check if email service is properly configured"""
+        if not self.smtp_host or not self.smtp_port:
+            return False
+        if not self.smtp_username or not self.smtp_password:
+            return False
+        # from_email can fallback to smtp_username, so check if at least one is set
+        if not self.from_email and not self.smtp_username:
+            return False
+        return True
+
+    def _is_configured(self) -> bool:
+        """Cached result of the startup configuration check"""
+        return self._configured
+    
+    async def _create_smtp_connection(self):
+        """Create secure async SMTP connection"""
+        if not self._is_configured():
+            raise ValueError("Email service is not properly configured. Please check your .env file for EMAIL_SMTP_* settings.")
+        
+        context = self._tls_context
+
+        # For port 587, use STARTTLS (connect first, then upgrade)
+        # For port 465, use direct TLS (use_tls=True)
+        if self.smtp_port == 587:
+            # Port 587 uses STARTTLS - aiosmtplib handles this automatically
+            server = aiosmtplib.SMTP(
+                hostname=self.smtp_host,
+                port=self.smtp_port,
+                use_tls=False,  # Don't use direct TLS
+                start_tls=True,  # Use STARTTLS instead
+                tls_context=context
+            )
+            await server.connect()
+        else:
+            # Port 465 or other ports use direct TLS
+            server = aiosmtplib.SMTP(
+                hostname=self.smtp_host,
+                port=self.smtp_port,
+                use_tls=True,
+                tls_context=context
+            )
+            await server.connect()
+        
+        if self.smtp_username and self.smtp_password:
+            await server.login(self.smtp_username, self.smtp_password)
+
+        return server
+
+    def _build_message(self, subject: str, to_email: str, text_content: Optional[str], html_content: str):
+        """Assemble an outgoing message with the cached From header.
+
+        With text_content the result is multipart/alternative; without it
+        a single-part HTML message goes out, roughly halving the encoded
+        payload.
+        """
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = self._from_header
+        msg['To'] = to_email
+        if text_content:
+            msg.set_content(text_content)
+            msg.add_alternative(html_content, subtype='html')
+        else:
+            msg.set_content(html_content, subtype='html')
+        return msg
+
+    async def _acquire_connection(self):
+        """Get a pooled SMTP connection, creating one if under the pool cap"""
+        if self._pool is None:
+            self._pool = asyncio.Queue()
+        if not self._pool.empty():
+            return self._pool.get_nowait()
+        async with self._pool_lock:
+            if self._pool_created < self.pool_size:
+                self._pool_created += 1
+                try:
+                    return await self._create_smtp_connection()
+                except BaseException:
+                    self._pool_created -= 1
+                    raise
+        # Pool is at capacity - wait for a connection to be released
+        return await self._pool.get()
+
+    def _release_connection(self, conn) -> None:
+        """Return a connection to the pool (None means it was lost)"""
+        if conn is not None:
+            self._pool.put_nowait(conn)
+        else:
+            # Connection could not be re-established; a future send
+            # will create a replacement
+            self._pool_created -= 1
+
+    async def _send(self, msg) -> None:
+        """Send a message over a pooled SMTP connection (reconnect if needed)"""
+        conn = await self._acquire_connection()
+        try:
+            if not conn.is_connected:
+                conn = None
+                conn = await self._create_smtp_connection()
+            try:
+                await conn.send_message(msg)
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError):
+                # SMTP servers drop idle connections without warning;
+                # is_connected can't see that, so reconnect and retry once
+                conn = None
+                conn = await self._create_smtp_connection()
+                await conn.send_message(msg)
+        finally:
+            self._release_connection(conn)
+
+    def send_in_background(self, send_coro) -> None:
+        """Queue an email send without blocking the caller.
+
+        The HTTP response should not wait on SMTP round trips - pass one of
+        the send_* coroutines here and a background worker sends it.
+        Queued sends are processed one at a time over the shared
+        connection; failures are logged instead of surfacing to the
+        request.
+        """
+        if self._send_queue is None:
+            self._send_queue = asyncio.Queue()
+            self._send_worker = asyncio.create_task(self._drain_send_queue())
+        self._send_queue.put_nowait(send_coro)
+
+    async def _drain_send_queue(self) -> None:
+        """Worker task: send queued emails sequentially"""
+        while True:
+            send_coro = await self._send_queue.get()
+            try:
+                await send_coro
+            except Exception as e:
+                logger.error("Background email send failed: %s", e)
+            finally:
+                self._send_queue.task_done()
+
+    async def close(self) -> None:
+        """Drain pending sends and close pooled SMTP connections (on shutdown)"""
+        if self._send_worker is not None:
+            await self._send_queue.join()
+            self._send_worker.cancel()
+            self._send_worker = None
+            self._send_queue = None
+        if self._pool is not None:
+            while not self._pool.empty():
+                conn = self._pool.get_nowait()
+                self._pool_created -= 1
+                try:
+                    await conn.quit()
+                except Exception:
+                    pass
+            self._pool = None
+            self._pool_created = 0
+
+    async def send_welcome_email(self, to_email: str, user_type: str, name: str = None) -> bool:
+        """Send welcome email after registration"""
+        # Check if email service is configured
+        if not self._is_configured():
+            logger.error("Cannot send welcome email to %s - Email service not configured", to_email)
+            logger.error("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
+            return False
+        
+        try:
+            display_name = _display_name(name, to_email)
             
-            text_part = MIMEText(text_content, 'plain')
-            html_part = MIMEText(html_content, 'html')
+            html_content = _WELCOME_HTML_TEMPLATE.format(
+                user_type=user_type, display_name=display_name
+            )
             
-            msg.attach(text_part)
-            msg.attach(html_part)
+            text_content = _WELCOME_TEXT_TEMPLATE.format(
+                user_type=user_type, display_name=display_name
+            )
             
-            # Send email using async SMTP
-            server = await self._create_smtp_connection()
-            try:
-                await server.send_message(msg)
-                print(f"[SUCCESS] Custom email sent successfully to {to_email}")
-                return True
-            finally:
-                await server.quit()
+            msg = self._build_message(
+                "Welcome to OneMove Affiliate Management System",
+                to_email, text_content, html_content
+            )
+            
+            # Send email over the reused async SMTP connection
+            await self._send(msg)
+            logger.info("Welcome email sent successfully to %s", to_email)
+            return True
+            
+        except ValueError as e:
+            # Configuration error
+            logger.error("%s", e)
+            return False
+        except Exception as e:
+            logger.exception("Failed to send welcome email to %s: %s", to_email, e)
+            return False
+    
+    async def send_password_reset_email(self, to_email: str, reset_token: str) -> bool:
+        """Send password reset email with professional template"""
+        # Check if email service is configured
+        if not self._is_configured():
+            logger.error("Cannot send password reset email to %s - Email service not configured", to_email)
+            logger.error("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
+            return False
+        
+        try:
+            # Create reset URL (you can customize this based on your frontend)
+            reset_url = _RESET_URL_BASE + quote(reset_token)
+            
+            html_content = _PASSWORD_RESET_HTML_TEMPLATE.format(reset_url=reset_url)
+            
+            # Plain text version
+            text_content = _PASSWORD_RESET_TEXT_TEMPLATE.format(reset_url=reset_url)
+            
+            msg = self._build_message(
+                "OneMove Password Reset Request",
+                to_email, text_content, html_content
+            )
+            
+            # Send email over the reused async SMTP connection
+            await self._send(msg)
+            logger.info("Password reset email sent successfully to %s", to_email)
+            return True
+            
+        except ValueError as e:
+            # Configuration error
+            logger.error("%s", e)
+            return False
+        except Exception as e:
+            logger.exception("Failed to send password reset email to %s: %s", to_email, e)
+            return False
+    
+    async def send_custom_email(self, to_email: str, subject: str, message: str, recipient_name: str = None) -> bool:
+        """Send custom email with HTML content"""
+        # Check if email service is configured
+        if not self._is_configured():
+            logger.error("Cannot send custom email to %s - Email service not configured", to_email)
+            logger.error("Please set EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_USERNAME, EMAIL_SMTP_PASSWORD, and EMAIL_FROM_EMAIL in your .env file")
+            return False
+        
+        try:
+            display_name = _display_name(recipient_name, to_email)
+            
+            html_content = _CUSTOM_HTML_TEMPLATE.format(
+                subject=subject, display_name=display_name, message=message
+            )
+            
+            # Plain text version (strip HTML tags for basic text)
+            text_content = _CUSTOM_TEXT_TEMPLATE.format(
+                subject=subject, display_name=display_name,
+                message_text=_HTML_TAG_RE.sub('', message)
+            )
+            
+            msg = self._build_message(subject, to_email, text_content, html_content)
+            
+            # Send email over the reused async SMTP connection
+            await self._send(msg)
+            logger.info("Custom email sent successfully to %s", to_email)
+            return True
             
         except ValueError as e:
             # Configuration error
-            print(f"ERROR: {e}")
+            logger.error("%s", e)
             return False
         except Exception as e:
-            print(f"ERROR: Failed to send custom email to {to_email}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to send custom email to %s: %s", to_email, e)
             return False
     
     async def send_affiliate_template_email(
@@ -474,64 +603,44 @@ class EmailService:
         """Send email using affiliate's custom template with variable substitution"""
         # Check if email service is configured
         if not self._is_configured():
-            print(f"ERROR: Cannot send template email to {to_email} - Email service not configured")
+            logger.error("Cannot send template email to %s - Email service not configured", to_email)
             return False
         
         try:
             # Variable substitution mapping
             variables = {
-                '{member_name}': member_name,
-                '{member_email}': member_email,
-                '{affiliate_name}': affiliate_name,
-                '{affiliate_email}': affiliate_email,
-                '{unique_link}': unique_link,
-                '{registration_date}': registration_date
+                'member_name': member_name,
+                'member_email': member_email,
+                'affiliate_name': affiliate_name,
+                'affiliate_email': affiliate_email,
+                'unique_link': unique_link,
+                'registration_date': registration_date
             }
-            
-            # Substitute variables in subject and content
-            subject = affiliate_template['subject']
-            html_content = affiliate_template['html_content']
+
+            def _substitute(match):
+                return variables[match.group(1)]
+
+            # Substitute all variables in a single pass over each string
+            subject = _TEMPLATE_VAR_RE.sub(_substitute, affiliate_template['subject'])
+            html_content = _TEMPLATE_VAR_RE.sub(_substitute, affiliate_template['html_content'])
             text_content = affiliate_template.get('text_content', '')
+            if text_content:
+                text_content = _TEMPLATE_VAR_RE.sub(_substitute, text_content)
             
-            for var, value in variables.items():
-                subject = subject.replace(var, value)
-                html_content = html_content.replace(var, value)
-                if text_content:
-                    text_content = text_content.replace(var, value)
-            
-            # Create email message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
+            # No text part in the template -> single-part HTML message,
+            # instead of synthesizing a text body by stripping tags
+            msg = self._build_message(subject, to_email, text_content or None, html_content)
             
-            # If no text content provided, create basic text version from HTML
-            if not text_content:
-                import re
-                text_content = re.sub(r'<[^>]+>', '', html_content)
-            
-            text_part = MIMEText(text_content, 'plain')
-            html_part = MIMEText(html_content, 'html')
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email
-            server = await self._create_smtp_connection()
-            try:
-                await server.send_message(msg)
-                print(f"[SUCCESS] Affiliate template email sent successfully to {to_email}")
-                return True
-            finally:
-                await server.quit()
+            # Send email over the reused async SMTP connection
+            await self._send(msg)
+            logger.info("Affiliate template email sent successfully to %s", to_email)
+            return True
         
         except ValueError as e:
-            print(f"ERROR: {e}")
+            logger.error("%s", e)
             return False
         except Exception as e:
-            print(f"ERROR: Failed to send affiliate template email to {to_email}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to send affiliate template email to %s: %s", to_email, e)
             return False
 
 # Global email service instance
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from time import monotonic
 
 import models
 import crud
-from database import init_db, database_initialized
+import database
+from database import init_db
+from email_service import email_service
 from config import settings
 from routers import auth as auth_router, admin, affiliate, referral, tickets, public_notes, tutorials
 
@@ -30,15 +34,20 @@ async def lifespan(app: FastAPI):
         print("API is ready (database disconnected)")
     
     yield
-    
-    # Shutdown
+
+    # Shutdown - drain queued emails and close pooled SMTP connections
     print("Shutting down")
+    try:
+        await email_service.close()
+    except Exception as e:
+        print(f"Email service shutdown failed: {e}")
 
 app = FastAPI(
     title="Affiliate Management System",
     description="API for managing affiliate registrations and approvals",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware (configurable)
@@ -74,26 +83,31 @@ def read_root():
         "registration_endpoint": "/register/{admin_link}"
     }
 
-# Health check
+# Health check - the ping result is cached briefly so orchestrator probes
+# every few seconds don't turn into a ping storm on the database
+_health_cache = {"status": "disconnected", "expires": 0.0}
+_HEALTH_CACHE_TTL_SECONDS = 10
+
 @app.get("/health")
 async def health_check():
-    from database import database_initialized
-    import motor.motor_asyncio
-    from config import settings
-    
-    # Test actual database connection
-    db_status = "disconnected"
-    if database_initialized:
-        try:
-            client = motor.motor_asyncio.AsyncIOMotorClient(
-                settings.DATABASE_URL,
-                serverSelectionTimeoutMS=2000
-            )
-            await client.admin.command('ping')
-            db_status = "connected"
-        except:
-            db_status = "disconnected"
-    
+    # database.* attribute access (not a from-import) so the flag and
+    # client rebound by init_db are seen here
+    now = monotonic()
+    if now < _health_cache["expires"]:
+        db_status = _health_cache["status"]
+    else:
+        # Ping over the already-initialized shared client
+        db_status = "disconnected"
+        client = database.get_client()
+        if database.database_initialized and client is not None:
+            try:
+                await client.admin.command('ping')
+                db_status = "connected"
+            except:
+                db_status = "disconnected"
+        _health_cache["status"] = db_status
+        _health_cache["expires"] = now + _HEALTH_CACHE_TTL_SECONDS
+
     return {
         "status": "healthy",
         "database": db_status
@@ -1,10 +1,20 @@
 from beanie import Document, PydanticObjectId
 from pydantic import Field, ConfigDict
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Optional
 from datetime import datetime, timedelta
 from enum import Enum
 import secrets
 
+def utcnow() -> datetime:
+    """Single timestamp source for document default_factories.
+
+    Deliberately a plain datetime.utcnow() call: a tick-cached clock
+    would stamp distinct documents with identical times to save tens of
+    nanoseconds per write.
+    """
+    return datetime.utcnow()
+
 class RequestStatus(str, Enum):
     PENDING = "pending"
     APPROVED = "approved"
@@ -30,10 +40,13 @@ class User(Document):
     is_admin: bool = Field(default=False)
     is_active: bool = Field(default=True)
     is_email_verified: bool = Field(default=True)  # Auto-verified, no OTP required
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+        ]
 
 class AffiliateRequest(Document):
     model_config = ConfigDict(populate_by_name=True)
@@ -47,12 +60,26 @@ class AffiliateRequest(Document):
     puprime_link: str
     status: RequestStatus = Field(default=RequestStatus.PENDING)
     is_email_verified: bool = Field(default=True)  # Auto-verified, no OTP required
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     reviewed_at: Optional[datetime] = None
     reviewed_by: Optional[str] = None
 
     class Settings:
         name = "affiliate_requests"
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+            # Admin lists filter on status and page newest-first - the
+            # compound index serves both the match and the sort
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING)]),
+            # The pending poll is by far the hottest request query; a
+            # partial index covering only pending rows stays tiny (most
+            # requests end up approved/rejected) and is cheap to maintain
+            IndexModel(
+                [("created_at", DESCENDING)],
+                partialFilterExpression={"status": RequestStatus.PENDING.value},
+                name="pending_requests_by_date",
+            ),
+        ]
 
 class Affiliate(Document):
     model_config = ConfigDict(populate_by_name=True)
@@ -64,10 +91,14 @@ class Affiliate(Document):
     puprime_referral_code: Optional[str] = Field(None, alias="onemove_link", serialization_alias="onemove_link")
     puprime_link: str
     unique_link: str = Field(..., unique=True, index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
     class Settings:
         name = "affiliates"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], unique=True),
+            IndexModel([("unique_link", ASCENDING)], unique=True),
+        ]
 
 class Referral(Document):
     affiliate_id: PydanticObjectId = Field(..., index=True)  # Which affiliate referred them
@@ -84,10 +115,15 @@ class Referral(Document):
     find_us: str
     onemove_link: Optional[str] = None
     puprime_verification: Optional[bool] = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
     class Settings:
         name = "referrals"
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+            IndexModel([("affiliate_id", ASCENDING)]),
+            IndexModel([("unique_link", ASCENDING)]),
+        ]
 
 class EmailVerificationToken(Document):
     email: str = Field(..., index=True)
@@ -95,22 +131,33 @@ class EmailVerificationToken(Document):
     token_type: str = Field(..., index=True)  # "admin_registration", "affiliate_registration", "referral_registration"
     expires_at: datetime
     is_used: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     used_at: Optional[datetime] = None
 
     class Settings:
         name = "email_verification_tokens"
+        indexes = [
+            IndexModel([("token", ASCENDING)], unique=True),
+            IndexModel([("email", ASCENDING), ("token_type", ASCENDING)]),
+            # TTL: the server reaps expired tokens itself (checked about
+            # once a minute), so no cleanup sweep is ever needed and the
+            # collection stays as small as its live tokens
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
 
 class AffiliateNote(Document):
     affiliate_id: PydanticObjectId = Field(..., index=True)  # Which affiliate created the note
     referral_id: PydanticObjectId = Field(..., index=True)   # Which referral the note is about
     title: str
     note: str  # The note content
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "affiliate_notes"
+        indexes = [
+            IndexModel([("affiliate_id", ASCENDING), ("referral_id", ASCENDING)]),
+        ]
 
 class AffiliateEmailTemplate(Document):
     """Email template that affiliates can customize for new member welcome emails"""
@@ -119,17 +166,20 @@ class AffiliateEmailTemplate(Document):
     html_content: str = Field(..., min_length=1, max_length=10000)  # HTML email body
     text_content: Optional[str] = Field(None, max_length=10000)  # Plain text fallback
     is_active: bool = Field(default=True)  # Enable/disable template
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "affiliate_email_templates"
+        indexes = [
+            IndexModel([("affiliate_id", ASCENDING)], unique=True),
+        ]
 
 
 class SystemConfig(Document):
     admin_registration_link: str = Field(..., unique=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
     class Settings:
         name = "system_config"
@@ -156,12 +206,31 @@ class SupportTicket(Document):
     image_url: Optional[str] = None  # Cloudinary URL
     
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+    updated_at: datetime = Field(default_factory=utcnow)
     last_reply_at: Optional[datetime] = None  # Track when last reply was added
     
     class Settings:
         name = "support_tickets"
+        indexes = [
+            # Ticket lists always match on ticket_type plus either the
+            # creator, the assignee or a status filter, newest-first
+            IndexModel([
+                ("ticket_type", ASCENDING),
+                ("creator_id", ASCENDING),
+                ("created_at", DESCENDING),
+            ]),
+            IndexModel([
+                ("ticket_type", ASCENDING),
+                ("assigned_to_id", ASCENDING),
+                ("created_at", DESCENDING),
+            ]),
+            IndexModel([
+                ("ticket_type", ASCENDING),
+                ("status", ASCENDING),
+                ("created_at", DESCENDING),
+            ]),
+        ]
 
 class TicketReply(Document):
     """Reply/message in a support ticket conversation"""
@@ -178,10 +247,14 @@ class TicketReply(Document):
     image_url: Optional[str] = None  # Cloudinary URL
     
     # Timestamp
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
     
     class Settings:
         name = "ticket_replies"
+        indexes = [
+            # Conversations are read per ticket in chronological order
+            IndexModel([("ticket_id", ASCENDING), ("created_at", ASCENDING)]),
+        ]
 
 class PublicNote(Document):
     """Public announcements/notes that admins can post and anyone can read"""
@@ -190,8 +263,8 @@ class PublicNote(Document):
     author_id: PydanticObjectId = Field(..., index=True)  # Admin who created it
     author_email: str
     is_published: bool = Field(default=True)  # Can be used to hide notes without deleting
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "public_notes"
@@ -210,8 +283,8 @@ class TutorialVideo(Document):
     author_email: str
     is_published: bool = Field(default=True)  # Publish or keep as draft
     view_count: int = Field(default=0)  # Track video views
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "tutorial_videos"
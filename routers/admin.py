@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, status, Request, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from datetime import datetime
@@ -17,8 +18,15 @@ security = HTTPBearer()
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current admin user"""
     token = credentials.credentials
+    # Reject non-admin tokens from the claim alone - no point fetching
+    # the user document for a caller that can never pass the check
+    if auth.token_is_admin_claim(token) is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     current_user = await auth.get_current_user(token)
-    
+
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -37,8 +45,10 @@ async def create_admin_user(
     Only existing admins can create new admins.
     The new admin will have full access to all admin endpoints and the same registration link.
     """
-    # Check if email already exists
-    existing_user = await models.User.find_one(models.User.email == admin_data.email.lower().strip())
+    # Check if email already exists (existence check only)
+    existing_user = await models.User.find(
+        models.User.email == admin_data.email.lower().strip()
+    ).exists()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -69,11 +79,14 @@ async def create_admin_user(
 async def get_all_admins(
     page: int = 1,
     page_size: int = 50,
+    created_before: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_admin)
 ):
     """
     Get all admin users (paginated).
     Only admins can view the list of other admins.
+    For deep pagination pass created_before (created_at of the last item
+    of the previous page) instead of increasing page.
     """
     if page < 1:
         page = 1
@@ -81,13 +94,14 @@ async def get_all_admins(
         page_size = 1
     if page_size > 100:
         page_size = 100
-    
-    skip = (page - 1) * page_size
-    
+
+    skip = 0 if created_before is not None else (page - 1) * page_size
+
     # Get all admin users
-    admin_users = await models.User.find(
-        models.User.is_admin == True
-    ).sort("-created_at").skip(skip).limit(page_size).to_list()
+    query = models.User.find(models.User.is_admin == True)
+    if created_before is not None:
+        query = query.find(models.User.created_at < created_before)
+    admin_users = await query.sort("-created_at").skip(skip).limit(page_size).to_list()
     
     # Convert to response format
     result = []
@@ -106,23 +120,31 @@ async def get_all_admins(
 
 @router.get("/registration-link", response_model=schemas.AdminRegistrationLinkResponse)
 async def get_admin_registration_link(
-    request: Request,
     current_user: models.User = Depends(get_current_admin)
 ):
     """Get the fixed admin registration link"""
     admin_link = await crud.get_admin_registration_link()
-    base_url = str(request.base_url).rstrip('/')
-    
+
+    # settings.BASE_URL is the same deployment constant the /ref/ links
+    # use - no need to rebuild it from request.base_url per call
     return {
         "registration_link": admin_link,
-        "full_url": f"{base_url}/register/{admin_link}"
+        "full_url": f"{settings.BASE_URL}/register/{admin_link}"
     }
 
 
 @router.get("/pending-requests", response_model=List[schemas.AffiliateRequestResponse])
-async def get_pending_requests(current_user: models.User = Depends(get_current_admin)):
-    """Get all pending affiliate requests"""
-    return await crud.get_pending_requests()
+async def get_pending_requests(
+    limit: int = 100,
+    created_before: Optional[datetime] = None,
+    current_user: models.User = Depends(get_current_admin)
+):
+    """Get pending affiliate requests (newest first).
+
+    For the next page pass created_before (created_at of the last item
+    of the previous page).
+    """
+    return await crud.get_pending_requests(limit=limit, created_before=created_before)
 
 
 
@@ -136,8 +158,8 @@ async def review_affiliate_request(
     """Approve or reject an affiliate request"""
     if approval.approve:
         try:
-            affiliate = await crud.approve_affiliate_request(approval.request_id, str(current_user.id))
-            if not affiliate:
+            result = await crud.approve_affiliate_request(approval.request_id, str(current_user.id))
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Request not found or already processed"
@@ -148,15 +170,14 @@ async def review_affiliate_request(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
-        
-        # Get user email for response
-        user = await models.User.find_one(models.User.id == affiliate.user_id)
-        
+
+        affiliate, affiliate_email = result
+
         return {
             "message": "Affiliate approved successfully",
             "affiliate_id": str(affiliate.id),
             "unique_link": f"{settings.BASE_URL}/ref/{affiliate.unique_link}",
-            "affiliate_email": user.email,
+            "affiliate_email": affiliate_email,
             "status": "approved",
             "admin_reviewer": current_user.email,
             "reviewed_at": datetime.utcnow().isoformat()
@@ -184,26 +205,17 @@ async def review_affiliate_request(
 async def get_all_affiliates(
     page: int = 1,
     page_size: int = 20,
+    created_before: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_admin)
 ):
-    """Get all approved affiliates"""
-    affiliates = await crud.get_all_affiliates(page=page, page_size=page_size)
-    result = []
-    for affiliate in affiliates:
-        user = await models.User.find_one(models.User.id == affiliate.user_id)
-        if user and user.is_active:
-            result.append(schemas.AffiliateResponse(
-                id=str(affiliate.id),
-                name=affiliate.name,
-                email=user.email,
-                location=affiliate.location,
-                language=affiliate.language,
-                puprime_referral_code=affiliate.puprime_referral_code,
-                puprime_link=affiliate.puprime_link,
-                unique_link=f"{settings.BASE_URL}/ref/{affiliate.unique_link}",
-                created_at=affiliate.created_at
-            ))
-    return result
+    """Get all approved affiliates.
+
+    For deep pagination pass created_before (created_at of the last item
+    of the previous page) instead of increasing page.
+    """
+    return await crud.get_all_affiliates(
+        page=page, page_size=page_size, created_before=created_before
+    )
 
 
 @router.delete("/affiliates/{affiliate_id}")
@@ -239,22 +251,26 @@ async def delete_affiliate_profile(
             detail="Associated user not found"
         )
     
-    # Delete all referrals associated with this affiliate
-    referrals_result = await models.Referral.find(
-        models.Referral.affiliate_id == affiliate.id
-    ).delete()
-    
-    # Delete the affiliate request associated with this user's email
-    affiliate_request_result = await models.AffiliateRequest.find(
-        models.AffiliateRequest.email == user.email
-    ).delete()
-    
-    # Delete the affiliate profile
-    await affiliate.delete()
-    
-    # Delete the user account
-    await user.delete()
-    
+    # The four deletes touch different collections and don't depend on
+    # each other - overlap their round trips instead of paying them in
+    # sequence
+    referrals_result, affiliate_request_result, _, _ = await asyncio.gather(
+        models.Referral.find(
+            models.Referral.affiliate_id == affiliate.id
+        ).delete(),
+        models.AffiliateRequest.find(
+            models.AffiliateRequest.email == user.email
+        ).delete(),
+        affiliate.delete(),
+        user.delete(),
+    )
+
+    # The deleted account must not keep authenticating from the
+    # short-TTL user cache, and its request must drop out of cached
+    # admin listings
+    auth.invalidate_user_cache(user.email)
+    crud.invalidate_request_list_cache()
+
     return {
         "message": "Affiliate profile and account deleted successfully",
         "deleted_affiliate_id": str(affiliate.id),
@@ -272,14 +288,20 @@ async def get_all_referrals(
     page_size: int = 20,
     affiliate_id: Optional[str] = None,
     search: Optional[str] = None,
+    created_before: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_admin)
 ):
-    """Get all referrals across all affiliates (admin view)"""
+    """Get all referrals across all affiliates (admin view).
+
+    For deep pagination pass created_before (created_at of the last item
+    of the previous page) instead of increasing page.
+    """
     referrals = await crud.get_all_referrals(
-        page=page, 
+        page=page,
         page_size=page_size,
         affiliate_id=affiliate_id,
-        search=search
+        search=search,
+        created_before=created_before
     )
     return referrals
 
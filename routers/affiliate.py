@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, status, Header, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import RedirectResponse
@@ -150,12 +151,13 @@ async def register_through_affiliate_link(
     registration_data: schemas.ReferralRegistrationRequest
 ):
     """Register a new member through an affiliate's unique link"""
-    # Verify the affiliate link exists
-    affiliate = await models.Affiliate.find_one(
+    # Verify the affiliate link exists (crud re-resolves the affiliate,
+    # so an existence check is enough here)
+    affiliate_exists = await models.Affiliate.find(
         models.Affiliate.unique_link == unique_link
-    )
-    
-    if not affiliate:
+    ).exists()
+
+    if not affiliate_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid affiliate link"
@@ -248,22 +250,26 @@ async def delete_affiliate_profile(
             detail="Affiliate profile not found"
         )
     
-    # Delete all referrals associated with this affiliate
-    referrals_result = await models.Referral.find(
-        models.Referral.affiliate_id == affiliate.id
-    ).delete()
-    
-    # Delete the affiliate request associated with this user's email
-    affiliate_request_result = await models.AffiliateRequest.find(
-        models.AffiliateRequest.email == current_user.email
-    ).delete()
-    
-    # Delete the affiliate profile
-    await affiliate.delete()
-    
-    # Delete the user account
-    await current_user.delete()
-    
+    # The four deletes touch different collections and don't depend on
+    # each other - overlap their round trips instead of paying them in
+    # sequence
+    referrals_result, affiliate_request_result, _, _ = await asyncio.gather(
+        models.Referral.find(
+            models.Referral.affiliate_id == affiliate.id
+        ).delete(),
+        models.AffiliateRequest.find(
+            models.AffiliateRequest.email == current_user.email
+        ).delete(),
+        affiliate.delete(),
+        current_user.delete(),
+    )
+
+    # The deleted account must not keep authenticating from the
+    # short-TTL user cache, and its request must drop out of cached
+    # admin listings
+    auth.invalidate_user_cache(current_user.email)
+    crud.invalidate_request_list_cache()
+
     return {
         "message": "Affiliate profile and account deleted successfully",
         "deleted_affiliate_id": str(affiliate.id),
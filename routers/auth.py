@@ -48,9 +48,10 @@ async def admin_login(login_data: schemas.AdminLoginForm):
     auth.register_login_success(identifier)
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "user_type": "admin", "is_admin": True},
+        expires_delta=access_token_expires
     )
-    
+
     return schemas.LoginResponse(
         access_token=access_token,
         token_type="bearer",
@@ -116,9 +117,10 @@ async def affiliate_login(login_data: schemas.AffiliateLoginForm):
     auth.register_login_success(identifier)
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "user_type": "affiliate", "is_admin": False},
+        expires_delta=access_token_expires
     )
-    
+
     return schemas.LoginResponse(
         access_token=access_token,
         token_type="bearer",
@@ -152,7 +154,7 @@ async def referral_login(login_data: schemas.ReferralLoginForm):
     auth.register_login_success(identifier)
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": referral.email, "user_type": "referral"}, expires_delta=access_token_expires
+        data={"sub": referral.email, "user_type": "referral", "is_admin": False}, expires_delta=access_token_expires
     )
     
     return schemas.LoginResponse(
@@ -194,7 +196,8 @@ async def login(login_data: schemas.LoginForm):
     auth.register_login_success(identifier)
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "is_admin": user.is_admin},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
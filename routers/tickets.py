@@ -12,11 +12,43 @@ from beanie import PydanticObjectId
 router = APIRouter()
 security = HTTPBearer()
 
+# Status/priority query params arrive as free-form strings - resolve them
+# through precomputed value->enum maps instead of enum __call__ plus
+# try/except (the exception path also dodges the `status` module being
+# shadowed by the query parameter of the same name)
+_TICKET_STATUS_MAP = {s.value: s for s in models.TicketStatus}
+_TICKET_PRIORITY_MAP = {p.value: p for p in models.TicketPriority}
+
+def _parse_ticket_status(value: str) -> models.TicketStatus:
+    status_enum = _TICKET_STATUS_MAP.get(value)
+    if status_enum is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid status. Must be one of: open, ongoing, closed"
+        )
+    return status_enum
+
+def _parse_ticket_priority(value: str) -> models.TicketPriority:
+    priority_enum = _TICKET_PRIORITY_MAP.get(value)
+    if priority_enum is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid priority. Must be one of: average, medium, high"
+        )
+    return priority_enum
+
 # ==================== Authentication Dependencies ====================
 
 async def get_current_admin_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current admin user"""
     token = credentials.credentials
+    # Reject non-admin tokens from the claim alone - no point fetching
+    # the user document for a caller that can never pass the check
+    if auth.token_is_admin_claim(token) is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
     user = await auth.get_current_user(token)
     if not user.is_admin:
         raise HTTPException(
@@ -59,22 +91,10 @@ async def get_admin_tickets(
     priority_enum = None
     
     if status:
-        try:
-            status_enum = models.TicketStatus(status)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: open, ongoing, closed"
-            )
+        status_enum = _parse_ticket_status(status)
     
     if priority:
-        try:
-            priority_enum = models.TicketPriority(priority)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid priority. Must be one of: average, medium, high"
-            )
+        priority_enum = _parse_ticket_priority(priority)
     
     tickets = await crud.get_tickets_for_admin(
         status=status_enum,
@@ -190,9 +210,9 @@ async def admin_update_ticket(
     priority_enum = None
     
     if update_data.status:
-        status_enum = models.TicketStatus(update_data.status.value)
+        status_enum = _TICKET_STATUS_MAP[update_data.status.value]
     if update_data.priority:
-        priority_enum = models.TicketPriority(update_data.priority.value)
+        priority_enum = _TICKET_PRIORITY_MAP[update_data.priority.value]
     
     # Update ticket
     updated_ticket = await crud.update_ticket_status_priority(
@@ -254,13 +274,7 @@ async def create_affiliate_ticket(
 ):
     """Affiliate creates a ticket to admin"""
     # Validate priority
-    try:
-        priority_enum = models.TicketPriority(priority)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid priority. Must be one of: average, medium, high"
-        )
+    priority_enum = _parse_ticket_priority(priority)
     
     # Upload image if provided
     image_url = None
@@ -312,13 +326,7 @@ async def get_affiliate_tickets(
     # Convert string to enum if provided
     status_enum = None
     if status:
-        try:
-            status_enum = models.TicketStatus(status)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: open, ongoing, closed"
-            )
+        status_enum = _parse_ticket_status(status)
     
     tickets = await crud.get_tickets_by_affiliate(
         affiliate_id=str(current_affiliate.id),
@@ -427,22 +435,10 @@ async def get_member_tickets_for_affiliate(
     priority_enum = None
     
     if status:
-        try:
-            status_enum = models.TicketStatus(status)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: open, ongoing, closed"
-            )
+        status_enum = _parse_ticket_status(status)
     
     if priority:
-        try:
-            priority_enum = models.TicketPriority(priority)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid priority. Must be one of: average, medium, high"
-            )
+        priority_enum = _parse_ticket_priority(priority)
     
     tickets = await crud.get_member_tickets_for_affiliate(
         affiliate_id=str(current_affiliate.id),
@@ -562,9 +558,9 @@ async def affiliate_update_member_ticket(
     priority_enum = None
     
     if update_data.status:
-        status_enum = models.TicketStatus(update_data.status.value)
+        status_enum = _TICKET_STATUS_MAP[update_data.status.value]
     if update_data.priority:
-        priority_enum = models.TicketPriority(update_data.priority.value)
+        priority_enum = _TICKET_PRIORITY_MAP[update_data.priority.value]
     
     # Update ticket
     updated_ticket = await crud.update_ticket_status_priority(
@@ -624,13 +620,7 @@ async def create_member_ticket(
 ):
     """Member creates a ticket to their affiliate"""
     # Validate priority
-    try:
-        priority_enum = models.TicketPriority(priority)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid priority. Must be one of: average, medium, high"
-        )
+    priority_enum = _parse_ticket_priority(priority)
     
     # Upload image if provided
     image_url = None
@@ -682,13 +672,7 @@ async def get_member_tickets(
     # Convert string to enum if provided
     status_enum = None
     if status:
-        try:
-            status_enum = models.TicketStatus(status)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: open, ongoing, closed"
-            )
+        status_enum = _parse_ticket_status(status)
     
     tickets = await crud.get_tickets_by_member(
         member_id=str(current_member.id),
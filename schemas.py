@@ -1,12 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from datetime import datetime
-from enum import Enum
 
-class RequestStatus(str, Enum):
-    PENDING = "pending"
-    APPROVED = "approved"
-    REJECTED = "rejected"
+# Enums are defined once on the models side; re-exported here so schema
+# consumers keep their existing import paths without pydantic-core
+# registering a second copy of each enum schema
+from models import RequestStatus, TicketPriority, TicketStatus, TicketType
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -259,19 +258,9 @@ class TopAffiliateResponse(BaseModel):
 
 # ==================== Support Ticket Schemas ====================
 
-class TicketPriorityEnum(str, Enum):
-    AVERAGE = "average"
-    MEDIUM = "medium"
-    HIGH = "high"
-
-class TicketStatusEnum(str, Enum):
-    OPEN = "open"
-    ONGOING = "ongoing"
-    CLOSED = "closed"
-
-class TicketTypeEnum(str, Enum):
-    AFFILIATE_TO_ADMIN = "affiliate_to_admin"
-    MEMBER_TO_AFFILIATE = "member_to_affiliate"
+TicketPriorityEnum = TicketPriority
+TicketStatusEnum = TicketStatus
+TicketTypeEnum = TicketType
 
 class TicketCreateRequest(BaseModel):
     """Schema for creating a new support ticket"""